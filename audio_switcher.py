@@ -10,14 +10,18 @@ warnings.filterwarnings('ignore')
 
 import sys
 import os
-import json
-import subprocess
+import re
 import ctypes
+import functools
+import threading
 from ctypes import wintypes
 
-from comtypes import CLSCTX_ALL, CoInitialize, CoUninitialize, GUID
+import orjson
+
+from comtypes import CLSCTX_ALL, CoInitialize, COMError, GUID
 from pycaw.pycaw import AudioUtilities, IMMDeviceEnumerator
 from pycaw.constants import CLSID_MMDeviceEnumerator
+from pycaw.callbacks import MMNotificationClient
 import comtypes
 from PIL import Image, ImageDraw
 import pystray
@@ -37,114 +41,353 @@ def get_config_path():
 
 CONFIG_FILE = get_config_path()
 
+# Delay before a config mutation is flushed to disk; rapid successive
+# clicks are coalesced into one write
+SAVE_DEBOUNCE_SECONDS = 0.25
+
+# pystray runs menu construction and callbacks on its own loop thread;
+# comtypes only auto-initializes COM on the importing thread, so every
+# COM entry point guards itself with a per-thread init.
+_com_state = threading.local()
+
+
+def _ensure_com():
+    """Initialize COM on the calling thread if not done already."""
+    if not getattr(_com_state, 'initialized', False):
+        try:
+            CoInitialize()
+        except COMError:
+            pass
+        _com_state.initialized = True
+
+
+def _build_icon_image():
+    """Create a switch/swap icon."""
+    size = 64
+    image = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+
+    # Two horizontal arrows (swap symbol)
+    draw.line([(12, 20), (52, 20)], fill='white', width=4)
+    draw.polygon([(52, 20), (42, 12), (42, 28)], fill='white')
+
+    draw.line([(12, 44), (52, 44)], fill='white', width=4)
+    draw.polygon([(12, 44), (22, 36), (22, 52)], fill='white')
+
+    return image
+
+
+# The icon is fully deterministic, so render it once at import
+_ICON_IMAGE = _build_icon_image()
+
+# Input-side devices to hide from the output menu
+_SKIP_RE = re.compile(
+    r"microphone|mic|input|line in|rear green in|rear blue in|"
+    r"front green in|front pink in|rear pink in",
+    re.IGNORECASE
+)
+
+
+def _extract_device(dev):
+    """Pull id/name from one endpoint, or None if it is filtered out."""
+    try:
+        if dev.state.name != 'Active' or not dev.id:
+            return None
+        if hasattr(dev, 'flow') and dev.flow is not None:
+            if dev.flow.value != 0:
+                return None
+        name = dev.FriendlyName or ""
+        if _SKIP_RE.search(name):
+            return None
+        # Retain the IMMDevice pointer so the endpoint stays resolved
+        # for the lifetime of the cached entry
+        return {'id': dev.id, 'name': name, '_endpoint': getattr(dev, '_dev', None)}
+    except Exception:
+        return None
+
+
+# Win32 constants for process enumeration / termination
+TH32CS_SNAPPROCESS = 0x00000002
+INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+PROCESS_TERMINATE = 0x0001
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+PROCESS_VM_READ = 0x0010
+
+_kernel32 = ctypes.WinDLL('kernel32', use_last_error=True) if os.name == 'nt' else None
+_ntdll = ctypes.WinDLL('ntdll') if os.name == 'nt' else None
+
+
+class PROCESSENTRY32W(ctypes.Structure):
+    _fields_ = [
+        ('dwSize', wintypes.DWORD),
+        ('cntUsage', wintypes.DWORD),
+        ('th32ProcessID', wintypes.DWORD),
+        ('th32DefaultHeapID', ctypes.POINTER(ctypes.c_ulong)),
+        ('th32ModuleID', wintypes.DWORD),
+        ('cntThreads', wintypes.DWORD),
+        ('th32ParentProcessID', wintypes.DWORD),
+        ('pcPriClassBase', wintypes.LONG),
+        ('dwFlags', wintypes.DWORD),
+        ('szExeFile', ctypes.c_wchar * 260),
+    ]
+
+
+class UNICODE_STRING(ctypes.Structure):
+    _fields_ = [
+        ('Length', wintypes.USHORT),
+        ('MaximumLength', wintypes.USHORT),
+        ('Buffer', ctypes.c_void_p),
+    ]
+
+
+class PROCESS_BASIC_INFORMATION(ctypes.Structure):
+    _fields_ = [
+        ('Reserved1', ctypes.c_void_p),
+        ('PebBaseAddress', ctypes.c_void_p),
+        ('Reserved2', ctypes.c_void_p * 2),
+        ('UniqueProcessId', ctypes.c_void_p),
+        ('Reserved3', ctypes.c_void_p),
+    ]
+
+
+if _kernel32 is not None:
+    # Without explicit prototypes ctypes truncates HANDLE returns to c_int,
+    # so e.g. INVALID_HANDLE_VALUE would never compare equal on 64-bit
+    _kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+    _kernel32.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+    _kernel32.Process32FirstW.restype = wintypes.BOOL
+    _kernel32.Process32FirstW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+    _kernel32.Process32NextW.restype = wintypes.BOOL
+    _kernel32.Process32NextW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+    _kernel32.OpenProcess.restype = wintypes.HANDLE
+    _kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+    _kernel32.CloseHandle.restype = wintypes.BOOL
+    _kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+    _kernel32.TerminateProcess.restype = wintypes.BOOL
+    _kernel32.TerminateProcess.argtypes = [wintypes.HANDLE, wintypes.UINT]
+    _kernel32.ReadProcessMemory.restype = wintypes.BOOL
+    _kernel32.ReadProcessMemory.argtypes = [
+        wintypes.HANDLE, wintypes.LPCVOID, wintypes.LPVOID,
+        ctypes.c_size_t, ctypes.POINTER(ctypes.c_size_t),
+    ]
+    _ntdll.NtQueryInformationProcess.restype = wintypes.LONG
+    _ntdll.NtQueryInformationProcess.argtypes = [
+        wintypes.HANDLE, ctypes.c_int, ctypes.c_void_p,
+        wintypes.ULONG, ctypes.POINTER(wintypes.ULONG),
+    ]
+
+
+def _read_command_line(pid):
+    """Read a process command line from its PEB. Returns '' on failure."""
+    handle = _kernel32.OpenProcess(
+        PROCESS_QUERY_LIMITED_INFORMATION | PROCESS_VM_READ, False, pid)
+    if not handle:
+        return ''
+    try:
+        pbi = PROCESS_BASIC_INFORMATION()
+        status = _ntdll.NtQueryInformationProcess(
+            handle, 0, ctypes.byref(pbi), ctypes.sizeof(pbi), None)
+        if status != 0 or not pbi.PebBaseAddress:
+            return ''
+
+        read = ctypes.c_size_t()
+        # PEB.ProcessParameters (offset 0x20 on x64, 0x10 on x86)
+        params_offset = 0x20 if ctypes.sizeof(ctypes.c_void_p) == 8 else 0x10
+        params_ptr = ctypes.c_void_p()
+        if not _kernel32.ReadProcessMemory(
+                handle, ctypes.c_void_p(pbi.PebBaseAddress + params_offset),
+                ctypes.byref(params_ptr), ctypes.sizeof(params_ptr), ctypes.byref(read)):
+            return ''
+
+        # RTL_USER_PROCESS_PARAMETERS.CommandLine (offset 0x70 on x64, 0x40 on x86)
+        cmdline_offset = 0x70 if ctypes.sizeof(ctypes.c_void_p) == 8 else 0x40
+        cmdline = UNICODE_STRING()
+        if not _kernel32.ReadProcessMemory(
+                handle, ctypes.c_void_p(params_ptr.value + cmdline_offset),
+                ctypes.byref(cmdline), ctypes.sizeof(cmdline), ctypes.byref(read)):
+            return ''
+        if not cmdline.Buffer or not cmdline.Length:
+            return ''
+
+        buf = ctypes.create_string_buffer(cmdline.Length)
+        if not _kernel32.ReadProcessMemory(
+                handle, ctypes.c_void_p(cmdline.Buffer),
+                buf, cmdline.Length, ctypes.byref(read)):
+            return ''
+        return buf.raw.decode('utf-16-le', errors='ignore')
+    except Exception:
+        return ''
+    finally:
+        _kernel32.CloseHandle(handle)
+
+
+def _terminate_pid(pid):
+    """Forcefully terminate a process by PID."""
+    handle = _kernel32.OpenProcess(PROCESS_TERMINATE, False, pid)
+    if handle:
+        try:
+            _kernel32.TerminateProcess(handle, 1)
+        finally:
+            _kernel32.CloseHandle(handle)
+
 
 def kill_existing_instance():
     """Kill any existing instance of this application."""
     current_pid = os.getpid()
 
-    # Kill pythonw.exe running audio_switcher.py
+    # One in-process Toolhelp snapshot instead of spawning wmic/taskkill
     try:
-        result = subprocess.run(
-            ['wmic', 'process', 'where',
-             "name='pythonw.exe' and commandline like '%audio_switcher.py%'",
-             'get', 'processid'],
-            capture_output=True, text=True, creationflags=subprocess.CREATE_NO_WINDOW
-        )
-        for line in result.stdout.strip().split('\n'):
-            line = line.strip()
-            if line.isdigit():
-                pid = int(line)
+        snapshot = _kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+        if snapshot == INVALID_HANDLE_VALUE:
+            return
+        try:
+            entry = PROCESSENTRY32W()
+            entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+            has_next = _kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+            while has_next:
+                pid = entry.th32ProcessID
                 if pid != current_pid:
-                    subprocess.run(['taskkill', '/f', '/pid', str(pid)],
-                                   capture_output=True, creationflags=subprocess.CREATE_NO_WINDOW)
+                    exe = entry.szExeFile.lower()
+                    if exe == 'audioswitcher.exe':
+                        _terminate_pid(pid)
+                    elif exe == 'pythonw.exe':
+                        # Only kill pythonw instances actually running this script
+                        if 'audio_switcher.py' in _read_command_line(pid):
+                            _terminate_pid(pid)
+                has_next = _kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+        finally:
+            _kernel32.CloseHandle(snapshot)
     except Exception:
         pass
 
-    # Kill AudioSwitcher.exe
-    try:
-        result = subprocess.run(
-            ['wmic', 'process', 'where', "name='AudioSwitcher.exe'", 'get', 'processid'],
-            capture_output=True, text=True, creationflags=subprocess.CREATE_NO_WINDOW
-        )
-        for line in result.stdout.strip().split('\n'):
-            line = line.strip()
-            if line.isdigit():
-                pid = int(line)
-                if pid != current_pid:
-                    subprocess.run(['taskkill', '/f', '/pid', str(pid)],
-                                   capture_output=True, creationflags=subprocess.CREATE_NO_WINDOW)
-    except Exception:
-        pass
+
+# Serialized form of the last config written (or loaded) from disk,
+# used to skip redundant writes.
+_last_config_bytes = None
 
 
 def load_config():
     """Load configuration from file."""
+    global _last_config_bytes
     try:
         if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(CONFIG_FILE, 'rb') as f:
+                config = orjson.loads(f.read())
+            _last_config_bytes = orjson.dumps(config, option=orjson.OPT_INDENT_2)
+            return config
     except Exception:
         pass
     return {'favorite1': None, 'favorite2': None}
 
 
 def save_config(config):
-    """Save configuration to file."""
+    """Save configuration to file (atomic, skipped when unchanged)."""
+    global _last_config_bytes
     try:
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
+        data = orjson.dumps(config, option=orjson.OPT_INDENT_2)
+        if data == _last_config_bytes:
+            return
+        tmp = CONFIG_FILE + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, CONFIG_FILE)
+        _last_config_bytes = data
     except Exception:
         pass
 
 
+# IPolicyConfig is undocumented; defined once at import so that
+# PolicyConfigClient construction is just a CoCreateInstance.
+IID_IPolicyConfig = GUID("{F8679F50-850A-41CF-9C72-430F290290C8}")
+CLSID_PolicyConfigClient = GUID("{870AF99C-171D-4F9E-AF0D-E63DF40C2BC9}")
+
+
+class IPolicyConfig(comtypes.IUnknown):
+    _iid_ = IID_IPolicyConfig
+    _methods_ = [
+        comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused1'),
+        comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused2'),
+        comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused3'),
+        comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused4'),
+        comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused5'),
+        comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused6'),
+        comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused7'),
+        comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused8'),
+        comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused9'),
+        comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused10'),
+        comtypes.COMMETHOD(
+            [], comtypes.HRESULT, 'SetDefaultEndpoint',
+            (['in'], comtypes.c_wchar_p, 'deviceId'),
+            (['in'], comtypes.c_uint, 'role')
+        ),
+    ]
+
+
 class PolicyConfigClient:
     """Interface to set default audio endpoint."""
 
-    def __init__(self):
-        self._policy_config = None
-        self._init_policy_config()
+    # One interface pointer shared by all instances; the activation is
+    # paid at most once per process
+    _shared_policy_config = None
 
-    def _init_policy_config(self):
-        try:
-            IID_IPolicyConfig = GUID("{F8679F50-850A-41CF-9C72-430F290290C8}")
-            CLSID_PolicyConfigClient = GUID("{870AF99C-171D-4F9E-AF0D-E63DF40C2BC9}")
-
-            class IPolicyConfig(comtypes.IUnknown):
-                _iid_ = IID_IPolicyConfig
-                _methods_ = [
-                    comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused1'),
-                    comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused2'),
-                    comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused3'),
-                    comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused4'),
-                    comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused5'),
-                    comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused6'),
-                    comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused7'),
-                    comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused8'),
-                    comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused9'),
-                    comtypes.COMMETHOD([], comtypes.HRESULT, 'Unused10'),
-                    comtypes.COMMETHOD(
-                        [], comtypes.HRESULT, 'SetDefaultEndpoint',
-                        (['in'], comtypes.c_wchar_p, 'deviceId'),
-                        (['in'], comtypes.c_uint, 'role')
-                    ),
-                ]
-
-            self._policy_config = comtypes.CoCreateInstance(
-                CLSID_PolicyConfigClient,
-                IPolicyConfig,
-                CLSCTX_ALL
-            )
-        except Exception as e:
-            self._policy_config = None
+    def __init__(self):
+        # Last device id set per role, kept current by the WASAPI
+        # notification callback; (role, device_id) pairs that failed are
+        # skipped until any call succeeds again.
+        self._last_default_by_role = {}
+        self._failed_endpoints = set()
+        if PolicyConfigClient._shared_policy_config is None:
+            try:
+                PolicyConfigClient._shared_policy_config = comtypes.CoCreateInstance(
+                    CLSID_PolicyConfigClient,
+                    IPolicyConfig,
+                    CLSCTX_ALL
+                )
+            except Exception:
+                pass
+        self._policy_config = PolicyConfigClient._shared_policy_config
 
     def set_default_endpoint(self, device_id: str):
-        """Set default audio endpoint for all roles."""
-        if self._policy_config:
-            for role in range(3):
-                try:
-                    self._policy_config.SetDefaultEndpoint(device_id, role)
-                except Exception:
-                    pass
+        """Set default audio endpoint for all roles, skipping no-op roles."""
+        if not self._policy_config:
+            return
+        for role in range(3):
+            if self._last_default_by_role.get(role) == device_id:
+                continue
+            if (role, device_id) in self._failed_endpoints:
+                continue
+            try:
+                self._policy_config.SetDefaultEndpoint(device_id, role)
+                self._last_default_by_role[role] = device_id
+                self._failed_endpoints.clear()
+            except COMError:
+                # Failures are device-specific (e.g. unplugged id), so
+                # remember the pair rather than writing off the role
+                self._failed_endpoints.add((role, device_id))
+
+
+class _DeviceChangeClient(MMNotificationClient):
+    """Keeps the switcher's cached state in sync with WASAPI notifications."""
+
+    def __init__(self, switcher):
+        super().__init__()
+        self._switcher = switcher
+
+    def on_default_device_changed(self, flow, flow_id, role, role_id, default_device_id):
+        if flow_id == 0:  # eRender
+            self._switcher._cached_default_id = default_device_id
+            client = self._switcher.policy_client
+            if client is not None:
+                client._last_default_by_role[role_id] = default_device_id
+
+    def on_device_added(self, added_device_id):
+        self._switcher._devices_dirty = True
+
+    def on_device_removed(self, removed_device_id):
+        self._switcher._devices_dirty = True
+
+    def on_device_state_changed(self, device_id, new_state, new_state_id):
+        self._switcher._devices_dirty = True
 
 
 class AudioSwitcher:
@@ -155,64 +398,114 @@ class AudioSwitcher:
         self.policy_client = None
         self._running = True
         self._devices = []
+        self._device_by_id = {}
+        self._devices_dirty = True
+        self._devices_rev = 0
+        self._devices_sig = ()
+        self._menu_rev = -1
+        self._menu_items = None
         self._config = load_config()
+        # Slot-indexed favorites (index 0 unused); projected back into
+        # _config only at save time
+        self._fav = [None, self._config.get('favorite1'), self._config.get('favorite2')]
+        self._enumerator = None
+        self._notification_client = None
+        self._cached_default_id = None
+        self._stopped = threading.Event()
+        self._save_timer = None
+        self._save_lock = threading.Lock()
+        self._cached_default_id = self._query_default_device_id()
         self._refresh_devices()
 
+    def _get_enumerator(self):
+        """Return the shared device enumerator, creating it on first use."""
+        _ensure_com()
+        if self._enumerator is None:
+            try:
+                self._enumerator = comtypes.CoCreateInstance(
+                    CLSID_MMDeviceEnumerator,
+                    IMMDeviceEnumerator,
+                    CLSCTX_ALL
+                )
+            except Exception:
+                pass
+        return self._enumerator
+
+    def _register_notifications(self):
+        """Subscribe to WASAPI change notifications (on the COM thread)."""
+        if self._notification_client is not None:
+            return
+        enumerator = self._get_enumerator()
+        if enumerator is None:
+            return
+        try:
+            self._notification_client = _DeviceChangeClient(self)
+            enumerator.RegisterEndpointNotificationCallback(
+                self._notification_client)
+        except Exception:
+            self._notification_client = None
+
     def _refresh_devices(self):
-        """Refresh the list of audio devices."""
+        """Refresh the list of audio devices (no-op while the cache is clean)."""
+        if not self._devices_dirty:
+            return
+        _ensure_com()
+        self._devices_dirty = False
         self._devices = []
         try:
             all_devices = AudioUtilities.GetAllDevices()
-            for dev in all_devices:
-                if dev.state.name == 'Active' and dev.id:
-                    if hasattr(dev, 'flow') and dev.flow is not None:
-                        if dev.flow.value != 0:
-                            continue
-
-                    name = dev.FriendlyName or ""
-                    skip_patterns = ['Microphone', 'Mic', 'Input', 'Line In', 'Rear Green In',
-                                     'Rear Blue In', 'Front Green In', 'Front Pink In',
-                                     'Rear Pink In']
-                    if any(pattern.lower() in name.lower() for pattern in skip_patterns):
-                        continue
-
-                    self._devices.append({
-                        'id': dev.id,
-                        'name': name or f"Device {len(self._devices) + 1}"
-                    })
+            for entry in map(_extract_device, all_devices):
+                if entry:
+                    if not entry['name']:
+                        entry['name'] = f"Device {len(self._devices) + 1}"
+                    self._devices.append(entry)
         except Exception:
             pass
-
-    def get_default_device_id(self):
-        """Get current default audio output device ID."""
+        self._device_by_id = {d['id']: d for d in self._devices}
+        # Bump the revision only when the list actually changed, so the
+        # menu cache is reused across no-op refreshes
+        new_sig = tuple((d['id'], d['name']) for d in self._devices)
+        if new_sig != self._devices_sig:
+            self._devices_sig = new_sig
+            self._devices_rev += 1
+
+    def _query_default_device_id(self):
+        """Ask WASAPI for the current default output device ID."""
+        enumerator = self._get_enumerator()
+        if enumerator is None:
+            return None
         try:
-            deviceEnumerator = comtypes.CoCreateInstance(
-                CLSID_MMDeviceEnumerator,
-                IMMDeviceEnumerator,
-                CLSCTX_ALL
-            )
-            default_device = deviceEnumerator.GetDefaultAudioEndpoint(0, 0)
-            return default_device.GetId()
-        except Exception:
+            return enumerator.GetDefaultAudioEndpoint(0, 0).GetId()
+        except COMError:
             return None
 
+    def get_default_device_id(self):
+        """Get current default audio output device ID (cached)."""
+        if self._cached_default_id is None:
+            self._cached_default_id = self._query_default_device_id()
+        return self._cached_default_id
+
     def set_default_device(self, device_id: str):
         """Set default audio output device."""
+        # Skip devices known to be unplugged; an empty or stale cache
+        # stays permissive so toggles work before the first enumeration
+        if (self._device_by_id and not self._devices_dirty
+                and device_id not in self._device_by_id):
+            return
+        _ensure_com()
         if self.policy_client is None:
             self.policy_client = PolicyConfigClient()
         self.policy_client.set_default_endpoint(device_id)
 
     def get_device_name(self, device_id):
         """Get device name by ID."""
-        for dev in self._devices:
-            if dev['id'] == device_id:
-                return dev['name']
-        return None
+        device = self._device_by_id.get(device_id)
+        return device['name'] if device else None
 
     def toggle_favorites(self):
         """Toggle between two favorite devices."""
-        fav1 = self._config.get('favorite1')
-        fav2 = self._config.get('favorite2')
+        fav1 = self._fav[1]
+        fav2 = self._fav[2]
 
         if not fav1 or not fav2:
             return  # Favorites not set
@@ -226,54 +519,54 @@ class AudioSwitcher:
 
     def set_favorite(self, slot, device_id):
         """Set a device as favorite."""
-        self._config[f'favorite{slot}'] = device_id
+        self._fav[slot] = device_id
+        self._config['favorite1'] = self._fav[1]
+        self._config['favorite2'] = self._fav[2]
+        self._schedule_save()
+
+    def _schedule_save(self):
+        """Schedule a debounced config write, resetting any pending timer."""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(SAVE_DEBOUNCE_SECONDS, self._flush_save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _flush_save(self):
+        """Write any pending config changes immediately."""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
         save_config(self._config)
 
-    def create_icon_image(self):
-        """Create a switch/swap icon."""
-        size = 64
-        image = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(image)
-
-        # Two horizontal arrows (swap symbol)
-        draw.line([(12, 20), (52, 20)], fill='white', width=4)
-        draw.polygon([(52, 20), (42, 12), (42, 28)], fill='white')
-
-        draw.line([(12, 44), (52, 44)], fill='white', width=4)
-        draw.polygon([(12, 44), (22, 36), (22, 52)], fill='white')
+    # Shared menu callables; per-item state is bound with functools.partial
+    # instead of manufacturing a closure per device per menu build.
 
-        return image
-
-    def _is_default(self, device_id):
+    def _check_default(self, device_id, item):
         """Check if device is the default."""
-        def check(item):
-            return self.get_default_device_id() == device_id
-        return check
+        return self._cached_default_id == device_id
 
-    def _is_favorite(self, slot, device_id):
+    def _check_favorite(self, slot, device_id, item):
         """Check if device is the favorite for given slot."""
-        def check(item):
-            return self._config.get(f'favorite{slot}') == device_id
-        return check
-
-    def _make_select_callback(self, device_id):
-        """Create callback for device selection."""
-        def callback(icon, item):
-            self.set_default_device(device_id)
-        return callback
-
-    def _make_favorite_callback(self, slot, device_id):
-        """Create callback for setting favorite."""
-        def callback(icon, item):
-            self.set_favorite(slot, device_id)
-        return callback
+        return self._fav[slot] == device_id
+
+    def _on_select(self, device_id, icon, item):
+        """Handle device selection."""
+        self.set_default_device(device_id)
+
+    def _on_set_favorite(self, slot, device_id, icon, item):
+        """Handle setting a favorite slot."""
+        self.set_favorite(slot, device_id)
 
     def _on_click(self, icon, item):
         """Handle left-click on icon."""
         self.toggle_favorites()
 
     def _on_refresh(self, icon, item):
-        """Refresh device list."""
+        """Refresh device list (user-forced, always re-enumerates)."""
+        self._devices_dirty = True
         self._refresh_devices()
         icon.update_menu()
 
@@ -284,26 +577,34 @@ class AudioSwitcher:
             menu_items.append(
                 item(
                     device['name'],
-                    self._make_favorite_callback(slot, device['id']),
-                    checked=self._is_favorite(slot, device['id'])
+                    functools.partial(self._on_set_favorite, slot, device['id']),
+                    checked=functools.partial(self._check_favorite, slot, device['id'])
                 )
             )
         return pystray.Menu(*menu_items)
 
-    def _get_favorite_label(self, slot):
-        """Get dynamic label for favorite slot."""
-        def get_label(item):
-            name = self.get_device_name(self._config.get(f'favorite{slot}')) or '(Not set)'
-            return f'즐찾 [{slot}] {name}'
-        return get_label
+    def _favorite_label(self, slot, item):
+        """Dynamic label for a favorite slot."""
+        name = self.get_device_name(self._fav[slot]) or '(Not set)'
+        return f'즐찾 [{slot}] {name}'
 
     def create_menu(self):
-        """Create menu with audio devices."""
-        menu_items = []
+        """Create menu with audio devices (cached per device-list revision)."""
+        # No-op while clean; picks up device-change invalidations on rebuild
+        self._refresh_devices()
+        if self._menu_items is not None and self._menu_rev == self._devices_rev:
+            return self._menu_items
+
+        # Warm the default-id cache once so every checkmark below is a
+        # plain attribute compare during repaints.
+        self.get_default_device_id()
+        menu_items = [item('Toggle', self._on_click, default=True, visible=False)]
 
         # Toggle info with dynamic labels
-        menu_items.append(item(self._get_favorite_label(1), self._create_favorite_submenu(1)))
-        menu_items.append(item(self._get_favorite_label(2), self._create_favorite_submenu(2)))
+        menu_items.append(item(functools.partial(self._favorite_label, 1),
+                               self._create_favorite_submenu(1)))
+        menu_items.append(item(functools.partial(self._favorite_label, 2),
+                               self._create_favorite_submenu(2)))
 
         menu_items.append(pystray.Menu.SEPARATOR)
 
@@ -312,34 +613,46 @@ class AudioSwitcher:
             menu_items.append(
                 item(
                     device['name'],
-                    self._make_select_callback(device['id']),
-                    checked=self._is_default(device['id'])
+                    functools.partial(self._on_select, device['id']),
+                    checked=functools.partial(self._check_default, device['id'])
                 )
             )
 
         menu_items.append(pystray.Menu.SEPARATOR)
         menu_items.append(item('Refresh', self._on_refresh))
-        menu_items.append(item('Exit', lambda icon, item: icon.stop()))
+        menu_items.append(item('Exit', self._on_exit))
 
+        self._menu_items = menu_items
+        self._menu_rev = self._devices_rev
         return menu_items
 
+    def _on_ready(self, icon):
+        """Show the icon once the loop is up (runs on pystray's setup thread)."""
+        icon.visible = True
+
+    def _on_exit(self, icon, item):
+        """Flush pending state, stop the tray icon, release the main thread."""
+        self._flush_save()
+        icon.stop()
+        self._stopped.set()
+
     def run(self):
         """Run the application."""
-        CoInitialize()
-        try:
-            image = self.create_icon_image()
-            self.icon = pystray.Icon(
-                "audio_switcher",
-                image,
-                "Audio Switcher (Left-click to toggle)",
-                menu=pystray.Menu(
-                    item('Toggle', self._on_click, default=True, visible=False),
-                    *self.create_menu()
-                )
-            )
-            self.icon.run()
-        finally:
-            CoUninitialize()
+        # Passing the callable lets update_menu() pick up device-list
+        # changes while unchanged revisions reuse the cached items.
+        self.icon = pystray.Icon(
+            "audio_switcher",
+            _ICON_IMAGE,
+            "Audio Switcher (Left-click to toggle)",
+            menu=pystray.Menu(self.create_menu)
+        )
+        # Register from the main thread (already COM-initialized); WASAPI
+        # delivers the callbacks on its own worker thread regardless
+        self._register_notifications()
+        # Keep the pystray loop off the main thread so COM notification
+        # callbacks cannot deadlock against the menu event loop.
+        self.icon.run_detached(setup=self._on_ready)
+        self._stopped.wait()
 
 
 def main():